@@ -1,24 +1,44 @@
-from fastapi import APIRouter, HTTPException, Request, Header, Depends
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from datetime import datetime
-import uuid
-import json
-from typing import Optional
+import asyncio
+import itertools
+import os
+import orjson
+import re
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
 
 from src.core.config import config
-from src.core.logging import logger
+from src.core.logging import logger, LazyStr
 from src.core.client import OpenAIClient
 from src.models.claude import ClaudeMessagesRequest, ClaudeTokenCountRequest
 from src.conversion.request_converter import convert_claude_to_openai
 from src.conversion.response_converter import (
     convert_openai_to_claude_response,
     convert_openai_streaming_to_claude_with_cancellation,
+    batch_sse_events,
 )
 from src.core.model_manager import model_manager
-from src.utils.exa_search import process_websearch_via_exa
+from src.utils.exa_search import (
+    process_websearch_via_exa,
+    warm_up_exa_client,
+    close_exa_client,
+)
 
 router = APIRouter()
 
+# Request IDs only need to be unique within this process: a random per-process
+# seed plus a counter avoids an os.urandom syscall per request.
+_HOST_SEED = os.urandom(8).hex()
+_next_request_number = itertools.count().__next__
+
+# Maximum number of concurrent Exa searches issued for a single request
+WEBSEARCH_CONCURRENCY = 8
+
+# Markers of a WebSearch tool_result that failed or is still a placeholder
+_WEBSEARCH_RETRY_RE = re.compile(r"API Error|Did 0 searches|Web search results")
+
 openai_client = OpenAIClient(
     config.openai_api_key,
     config.openai_base_url,
@@ -26,113 +46,122 @@ openai_client = OpenAIClient(
     api_version=config.azure_api_version,
 )
 
-async def validate_api_key(x_api_key: Optional[str] = Header(None), authorization: Optional[str] = Header(None)):
-    """Validate the client's API key from either x-api-key header or Authorization header."""
-    client_api_key = None
-    
-    # Extract API key from headers
-    if x_api_key:
-        client_api_key = x_api_key
-    elif authorization and authorization.startswith("Bearer "):
-        client_api_key = authorization.replace("Bearer ", "")
-    
-    # Skip validation if ANTHROPIC_API_KEY is not set in the environment
-    if not config.anthropic_api_key:
-        return
-        
-    # Validate the client API key
-    if not client_api_key or not config.validate_client_api_key(client_api_key):
-        logger.warning(f"Invalid API key provided by client")
-        raise HTTPException(
-            status_code=401,
-            detail="Invalid API key. Please provide a valid Anthropic API key."
-        )
+
+async def start_clients():
+    """(Re)open and pre-warm pooled upstream connections on startup"""
+    await asyncio.gather(openai_client.start(), warm_up_exa_client())
+
+
+async def shutdown_clients():
+    """Release pooled upstream connections on shutdown"""
+    await asyncio.gather(openai_client.close(), close_exa_client())
+
 
 async def intercept_websearch_in_request(request: ClaudeMessagesRequest, logger) -> ClaudeMessagesRequest:
     """
     Check if the request contains WebSearch tool results that haven't been executed yet.
     If the previous message was a tool_use for WebSearch, execute it via Exa and inject results.
     """
-    logger.info(f"Checking for WebSearch interception, message count: {len(request.messages)}")
-    
-    # Check if there are messages with tool_use for WebSearch waiting for results
-    if len(request.messages) >= 2:
-        # Check the last assistant message for WebSearch tool_use
-        second_last = request.messages[-2]
-        last = request.messages[-1]
-        
-        logger.info(f"Second last role: {second_last.role}, Last role: {last.role}")
-        logger.info(f"Second last content type: {type(second_last.content)}, Last content type: {type(last.content)}")
-        
-        if (second_last.role == "assistant" and 
-            last.role == "user" and 
-            isinstance(second_last.content, list) and
-            isinstance(last.content, list)):
-            
-            # Check if assistant message has WebSearch tool_use
-            for assistant_block in second_last.content:
-                logger.info(f"Assistant block type: {getattr(assistant_block, 'type', 'no type')}, name: {getattr(assistant_block, 'name', 'no name')}")
-                if (hasattr(assistant_block, 'type') and 
-                    assistant_block.type == "tool_use" and 
-                    assistant_block.name == "WebSearch"):
-                    
-                    # Check if user message has corresponding tool_result placeholder
-                    for user_block in last.content:
-                        if (hasattr(user_block, 'type') and 
-                            user_block.type == "tool_result" and
-                            user_block.tool_use_id == assistant_block.id):
-                            
-                            # Check if the content contains an error or is a placeholder
-                            current_content = getattr(user_block, 'content', '')
-                            if isinstance(current_content, str):
-                                # If it contains an API error or is a failed search, replace it
-                                if 'API Error' in current_content or 'Did 0 searches' in current_content or 'Web search results' in current_content:
-                                    logger.info(f"Intercepting WebSearch execution with input: {assistant_block.input}")
-                                    
-                                    try:
-                                        # Execute the search via Exa
-                                        search_results = await process_websearch_via_exa(assistant_block.input)
-                                        
-                                        # Format results as JSON string for the tool result
-                                        user_block.content = json.dumps(search_results, ensure_ascii=False)
-                                        logger.info(f"Injected Exa search results into tool_result")
-                                        
-                                    except Exception as e:
-                                        logger.error(f"Error executing WebSearch via Exa: {e}")
-                                        # Inject error message if search fails
-                                        user_block.content = json.dumps({
-                                            "error": f"Search failed: {str(e)}",
-                                            "results": []
-                                        })
-    
+    # Fast path: only a user turn carrying tool_result blocks can need interception
+    if len(request.messages) < 2:
+        return request
+    last = request.messages[-1]
+    if not isinstance(last.content, list):
+        return request
+    if not any(block.type == "tool_result" for block in last.content):
+        return request
+
+    second_last = request.messages[-2]
+    logger.debug("Checking for WebSearch interception, message count: %d", len(request.messages))
+    logger.debug("Second last role: %s, Last role: %s", second_last.role, last.role)
+
+    if (second_last.role != "assistant" or
+        last.role != "user" or
+        not isinstance(second_last.content, list)):
+        return request
+
+    # Index the assistant's WebSearch tool_use blocks by id
+    websearch_calls = {
+        block.id: block
+        for block in second_last.content
+        if block.type == "tool_use" and block.name == "WebSearch"
+    }
+    if not websearch_calls:
+        return request
+
+    # Collect tool_result placeholders that need the search (re-)executed
+    pending = []
+    for user_block in last.content:
+        if user_block.type != "tool_result":
+            continue
+        assistant_block = websearch_calls.get(user_block.tool_use_id)
+        if assistant_block is None:
+            continue
+
+        # Check if the content contains an error or is a placeholder
+        current_content = user_block.content
+        if isinstance(current_content, str):
+            # If it contains an API error or is a failed search, replace it
+            if _WEBSEARCH_RETRY_RE.search(current_content):
+                logger.debug("Intercepting WebSearch execution with input: %s", assistant_block.input)
+                pending.append((user_block, assistant_block.input))
+
+    if not pending:
+        return request
+
+    # Execute the searches via Exa concurrently, bounded to avoid Exa rate limits
+    semaphore = asyncio.Semaphore(WEBSEARCH_CONCURRENCY)
+
+    async def run_search(tool_input):
+        async with semaphore:
+            return await process_websearch_via_exa(tool_input)
+
+    results = await asyncio.gather(
+        *(run_search(tool_input) for _, tool_input in pending),
+        return_exceptions=True,
+    )
+
+    for (user_block, _), result in zip(pending, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error executing WebSearch via Exa: {result}")
+            # Inject error message if search fails
+            user_block.content = orjson.dumps({
+                "error": f"Search failed: {str(result)}",
+                "results": []
+            }).decode()
+        else:
+            # Format results as JSON string for the tool result
+            user_block.content = orjson.dumps(result).decode()
+            logger.debug("Injected Exa search results into tool_result")
+
     return request
 
-@router.post("/v1/messages")
-async def create_message(request: ClaudeMessagesRequest, http_request: Request, _: None = Depends(validate_api_key)):
+@router.post("/v1/messages", response_model=None)
+async def create_message(request: ClaudeMessagesRequest, http_request: Request):
     try:
         logger.info(
             f"Processing Claude request: model={request.model}, stream={request.stream}"
         )
         
         # Debug: Log the full incoming Claude request
-        logger.info(f"=== INCOMING CLAUDE REQUEST ===\n{request.model_dump_json(indent=2)}")
+        logger.debug("=== INCOMING CLAUDE REQUEST ===\n%s", LazyStr(request.model_dump_json))
         
         # Intercept WebSearch tool results and execute via Exa if needed
         request = await intercept_websearch_in_request(request, logger)
 
         # Generate unique request ID for cancellation tracking
-        request_id = str(uuid.uuid4())
+        request_id = _HOST_SEED + format(_next_request_number(), "016x")
 
         # Convert Claude request to OpenAI format
         openai_request = convert_claude_to_openai(request, model_manager)
         
         # Debug: Log the converted OpenAI request
-        logger.info(f"=== CONVERTED OPENAI REQUEST ===\n{json.dumps(openai_request, indent=2)}")
-
-        # Check if client disconnected before processing
-        if await http_request.is_disconnected():
-            raise HTTPException(status_code=499, detail="Client disconnected")
+        logger.debug(
+            "=== CONVERTED OPENAI REQUEST ===\n%s",
+            LazyStr(lambda: orjson.dumps(openai_request).decode()),
+        )
 
+        # Streaming requests poll for client disconnects inside the stream generator
         if request.stream:
             # Streaming response - wrap in error handling
             try:
@@ -140,13 +169,15 @@ async def create_message(request: ClaudeMessagesRequest, http_request: Request,
                     openai_request, request_id
                 )
                 return StreamingResponse(
-                    convert_openai_streaming_to_claude_with_cancellation(
-                        openai_stream,
-                        request,
-                        logger,
-                        http_request,
-                        openai_client,
-                        request_id,
+                    batch_sse_events(
+                        convert_openai_streaming_to_claude_with_cancellation(
+                            openai_stream,
+                            request,
+                            logger,
+                            http_request,
+                            openai_client,
+                            request_id,
+                        )
                     ),
                     media_type="text/event-stream",
                     headers={
@@ -155,6 +186,7 @@ async def create_message(request: ClaudeMessagesRequest, http_request: Request,
                         "Access-Control-Allow-Origin": "*",
                         "Access-Control-Allow-Headers": "*",
                     },
+                    background=None,
                 )
             except HTTPException as e:
                 # Convert to proper error response for streaming
@@ -167,24 +199,36 @@ async def create_message(request: ClaudeMessagesRequest, http_request: Request,
                     "type": "error",
                     "error": {"type": "api_error", "message": error_message},
                 }
-                return JSONResponse(status_code=e.status_code, content=error_response)
+                return ORJSONResponse(status_code=e.status_code, content=error_response)
         else:
+            # Non-streaming handlers are not cancelled when the client goes away, and
+            # WebSearch interception may have spent seconds in Exa calls, so check once
+            # before paying for the upstream completion.
+            if await http_request.is_disconnected():
+                raise HTTPException(status_code=499, detail="Client disconnected")
+
             # Non-streaming response
             openai_response = await openai_client.create_chat_completion(
                 openai_request, request_id
             )
             
             # Debug: Log the converted OpenAI response before Claude conversion
-            logger.info(f"=== OPENAI RESPONSE BEFORE CONVERSION ===\n{json.dumps(openai_response, indent=2)}")
+            logger.debug(
+                "=== OPENAI RESPONSE BEFORE CONVERSION ===\n%s",
+                LazyStr(lambda: orjson.dumps(openai_response).decode()),
+            )
             
             claude_response = convert_openai_to_claude_response(
                 openai_response, request
             )
             
             # Debug: Log the final Claude response
-            logger.info(f"=== FINAL CLAUDE RESPONSE ===\n{json.dumps(claude_response, indent=2)}")
+            logger.debug(
+                "=== FINAL CLAUDE RESPONSE ===\n%s",
+                LazyStr(lambda: orjson.dumps(claude_response).decode()),
+            )
             
-            return claude_response
+            return ORJSONResponse(content=claude_response)
     except HTTPException:
         raise
     except Exception as e:
@@ -196,57 +240,116 @@ async def create_message(request: ClaudeMessagesRequest, http_request: Request,
         raise HTTPException(status_code=500, detail=error_message)
 
 
-@router.post("/v1/messages/count_tokens")
-async def count_tokens(request: ClaudeTokenCountRequest, _: None = Depends(validate_api_key)):
+# Text extraction dispatched on the exact type of a system prompt or message content
+_TEXT_EXTRACTORS: Dict[type, Callable[[Any], Iterable[str]]] = {
+    str: lambda value: (value,),
+    # Only text blocks carry text; dispatch on the block type rather than probing attributes
+    list: lambda blocks: (block.text for block in blocks if block.type == "text" and block.text),
+}
+
+
+def _no_texts(_):
+    return ()
+
+
+def _iter_request_texts(request: ClaudeTokenCountRequest):
+    """Yield every text fragment in the system prompt and messages."""
+    get_extractor = _TEXT_EXTRACTORS.get
+    system = request.system
+    yield from get_extractor(type(system), _no_texts)(system)
+
+    for msg in request.messages:
+        content = msg.content
+        yield from get_extractor(type(content), _no_texts)(content)
+
+
+# tiktoken downloads its BPE file on first use, so the encoding is loaded off the
+# event loop in the background; count_tokens estimates until it is ready.
+_TOKEN_ENCODING_RETRY_SECONDS = 60.0
+_token_encoding = None
+_token_encoding_load: Optional[asyncio.Task] = None
+_token_encoding_failed_at = float("-inf")
+
+
+async def _load_token_encoding():
+    global _token_encoding, _token_encoding_failed_at
     try:
-        # For token counting, we'll use a simple estimation
-        # In a real implementation, you might want to use tiktoken or similar
-
-        total_chars = 0
-
-        # Count system message characters
-        if request.system:
-            if isinstance(request.system, str):
-                total_chars += len(request.system)
-            elif isinstance(request.system, list):
-                for block in request.system:
-                    if hasattr(block, "text"):
-                        total_chars += len(block.text)
-
-        # Count message characters
-        for msg in request.messages:
-            if msg.content is None:
-                continue
-            elif isinstance(msg.content, str):
-                total_chars += len(msg.content)
-            elif isinstance(msg.content, list):
-                for block in msg.content:
-                    if hasattr(block, "text") and block.text is not None:
-                        total_chars += len(block.text)
-
-        # Rough estimation: 4 characters per token
-        estimated_tokens = max(1, total_chars // 4)
-
-        return {"input_tokens": estimated_tokens}
+        import tiktoken
+
+        _token_encoding = await asyncio.to_thread(tiktoken.get_encoding, "cl100k_base")
+    except Exception as e:
+        _token_encoding_failed_at = time.monotonic()
+        logger.warning(f"tiktoken unavailable, falling back to character estimate: {e}")
+
+
+def get_token_encoding():
+    """Return the tiktoken encoding, starting a background load if it isn't ready yet."""
+    global _token_encoding_load
+    if (
+        _token_encoding is None
+        and (_token_encoding_load is None or _token_encoding_load.done())
+        and time.monotonic() - _token_encoding_failed_at >= _TOKEN_ENCODING_RETRY_SECONDS
+    ):
+        _token_encoding_load = asyncio.create_task(_load_token_encoding())
+    return _token_encoding
+
+
+# Inputs up to this many characters are tokenized on the event loop; larger
+# histories go to a worker thread
+INLINE_ENCODE_MAX_CHARS = 20_000
+
+
+def _count_encoded_tokens(encoding, texts):
+    encode = encoding.encode_ordinary
+    return sum(len(encode(text)) for text in texts)
+
+
+@router.post("/v1/messages/count_tokens", response_model=None)
+async def count_tokens(request: ClaudeTokenCountRequest):
+    try:
+        texts = list(_iter_request_texts(request))
+        total_chars = sum(map(len, texts))
+
+        encoding = get_token_encoding()
+        if encoding is None:
+            # Rough estimation: 4 characters per token
+            total_tokens = total_chars // 4
+        elif total_chars <= INLINE_ENCODE_MAX_CHARS:
+            total_tokens = _count_encoded_tokens(encoding, texts)
+        else:
+            # Encoding a long history would stall every other request on this worker
+            total_tokens = await asyncio.to_thread(_count_encoded_tokens, encoding, texts)
+
+        return ORJSONResponse(content={"input_tokens": max(1, total_tokens)})
 
     except Exception as e:
         logger.error(f"Error counting tokens: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/health")
+_now = datetime.now
+
+# Config is read from the environment once at startup, so these never change
+_STATIC_HEALTH_FIELDS = {
+    "openai_api_configured": bool(config.openai_api_key),
+    "api_key_valid": config.validate_api_key(),
+    "client_api_key_validation": bool(config.anthropic_api_key),
+}
+
+# Static part of the health payload, left open so the timestamp can be appended
+_HEALTH_PREFIX = orjson.dumps({"status": "healthy", **_STATIC_HEALTH_FIELDS})[:-1]
+
+
+@router.get("/health", response_model=None)
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "openai_api_configured": bool(config.openai_api_key),
-        "api_key_valid": config.validate_api_key(),
-        "client_api_key_validation": bool(config.anthropic_api_key),
-    }
+    return Response(
+        content=_HEALTH_PREFIX + b',"timestamp":"' + _now().isoformat().encode() + b'"}',
+        media_type="application/json",
+    )
 
 
-@router.get("/test-connection")
+@router.get("/test-connection", response_model=None)
 async def test_connection():
     """Test API connectivity to OpenAI"""
     try:
@@ -259,23 +362,23 @@ async def test_connection():
             }
         )
 
-        return {
+        return ORJSONResponse(content={
             "status": "success",
             "message": "Successfully connected to OpenAI API",
             "model_used": config.small_model,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _now().isoformat(),
             "response_id": test_response.get("id", "unknown"),
-        }
+        })
 
     except Exception as e:
         logger.error(f"API connectivity test failed: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=503,
             content={
                 "status": "failed",
                 "error_type": "API Error",
                 "message": str(e),
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _now().isoformat(),
                 "suggestions": [
                     "Check your GROQ_API_KEY_KIMI (or OPENAI_API_KEY) is valid",
                     "Verify your API key has the necessary permissions",
@@ -285,24 +388,27 @@ async def test_connection():
         )
 
 
-@router.get("/")
+_ROOT_BODY = orjson.dumps({
+    "message": "Claude-to-OpenAI API Proxy v1.0.0",
+    "status": "running",
+    "config": {
+        "openai_base_url": config.openai_base_url,
+        "max_tokens_limit": config.max_tokens_limit,
+        "api_key_configured": _STATIC_HEALTH_FIELDS["openai_api_configured"],
+        "client_api_key_validation": _STATIC_HEALTH_FIELDS["client_api_key_validation"],
+        "big_model": config.big_model,
+        "small_model": config.small_model,
+    },
+    "endpoints": {
+        "messages": "/v1/messages",
+        "count_tokens": "/v1/messages/count_tokens",
+        "health": "/health",
+        "test_connection": "/test-connection",
+    },
+})
+
+
+@router.get("/", response_model=None)
 async def root():
     """Root endpoint"""
-    return {
-        "message": "Claude-to-OpenAI API Proxy v1.0.0",
-        "status": "running",
-        "config": {
-            "openai_base_url": config.openai_base_url,
-            "max_tokens_limit": config.max_tokens_limit,
-            "api_key_configured": bool(config.openai_api_key),
-            "client_api_key_validation": bool(config.anthropic_api_key),
-            "big_model": config.big_model,
-            "small_model": config.small_model,
-        },
-        "endpoints": {
-            "messages": "/v1/messages",
-            "count_tokens": "/v1/messages/count_tokens",
-            "health": "/health",
-            "test_connection": "/test-connection",
-        },
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
@@ -0,0 +1,82 @@
+import hmac
+
+import orjson
+
+from src.core.config import config
+from src.core.logging import logger
+
+# Routes reachable without a client API key; every other path is validated
+PUBLIC_PATHS = frozenset(
+    {"/", "/health", "/test-connection", "/docs", "/docs/oauth2-redirect", "/redoc", "/openapi.json"}
+)
+
+_UNAUTHORIZED_BODY = orjson.dumps(
+    {"detail": "Invalid API key. Please provide a valid Anthropic API key."}
+)
+
+
+def _route_path(scope):
+    """Return the request path relative to root_path, as the router matches it."""
+    path = scope["path"]
+    root_path = scope.get("root_path", "")
+    if root_path and path.startswith(root_path):
+        remainder = path[len(root_path):]
+        if not remainder or remainder.startswith("/"):
+            return remainder or "/"
+    return path
+
+
+class ApiKeyASGIMiddleware:
+    """Validate the client's API key from either x-api-key header or Authorization header.
+
+    Runs as a pure ASGI middleware so the check works on the raw header tuples
+    and rejects bad requests before FastAPI builds a Request or resolves dependencies.
+    """
+
+    def __init__(self, app, api_key=None):
+        self.app = app
+        api_key = api_key if api_key is not None else config.anthropic_api_key
+        self.expected_key = api_key.encode() if api_key else None
+
+    async def __call__(self, scope, receive, send):
+        # Skip validation if ANTHROPIC_API_KEY is not set in the environment
+        if (
+            self.expected_key is None
+            or scope["type"] != "http"
+            or _route_path(scope) in PUBLIC_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        # Extract API key from headers
+        x_api_key = None
+        authorization = None
+        for name, value in scope["headers"]:
+            if name == b"x-api-key":
+                x_api_key = value
+            elif name == b"authorization":
+                authorization = value
+
+        client_api_key = None
+        if x_api_key:
+            client_api_key = x_api_key
+        elif authorization and authorization.startswith(b"Bearer "):
+            client_api_key = authorization[7:]
+
+        # Validate the client API key
+        if client_api_key and hmac.compare_digest(client_api_key, self.expected_key):
+            await self.app(scope, receive, send)
+            return
+
+        logger.warning("Invalid API key provided by client")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 401,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(_UNAUTHORIZED_BODY)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": _UNAUTHORIZED_BODY})
@@ -63,7 +63,6 @@ def convert_claude_to_openai(
                     and any(
                         block.type == Constants.CONTENT_TOOL_RESULT
                         for block in next_msg.content
-                        if hasattr(block, "type")
                     )
                 ):
                     # Process tool results
@@ -1,9 +1,13 @@
+import asyncio
 import json
 import uuid
 from fastapi import HTTPException, Request
 from src.core.constants import Constants
 from src.models.claude import ClaudeMessagesRequest
 
+# Number of upstream chunks between client disconnect checks while streaming
+DISCONNECT_CHECK_INTERVAL = 16
+
 
 def convert_openai_to_claude_response(
     openai_response: dict, original_request: ClaudeMessagesRequest
@@ -239,10 +243,13 @@ async def convert_openai_streaming_to_claude_with_cancellation(
     final_stop_reason = Constants.STOP_END_TURN
     usage_data = {"input_tokens": 0, "output_tokens": 0}
 
+    chunk_count = 0
+
     try:
         async for line in openai_stream:
-            # Check if client disconnected
-            if await http_request.is_disconnected():
+            # Check if client disconnected, polling only every few chunks
+            chunk_count += 1
+            if chunk_count % DISCONNECT_CHECK_INTERVAL == 0 and await http_request.is_disconnected():
                 logger.info(f"Client disconnected, cancelling request {request_id}")
                 openai_client.cancel_request(request_id)
                 break
@@ -383,3 +390,58 @@ async def convert_openai_streaming_to_claude_with_cancellation(
 
     yield f"event: {Constants.EVENT_MESSAGE_DELTA}\ndata: {json.dumps({'type': Constants.EVENT_MESSAGE_DELTA, 'delta': {'stop_reason': final_stop_reason, 'stop_sequence': None}, 'usage': usage_data}, ensure_ascii=False)}\n\n"
     yield f"event: {Constants.EVENT_MESSAGE_STOP}\ndata: {json.dumps({'type': Constants.EVENT_MESSAGE_STOP}, ensure_ascii=False)}\n\n"
+
+
+async def batch_sse_events(events, max_bytes=4096, max_events=8, max_pending=64):
+    """
+    Coalesce SSE events into fewer, larger body chunks.
+    A single pump task moves events into a queue; each chunk takes whatever has
+    queued up (bounded by max_bytes/max_events), so events produced in one burst
+    share a send while an idle upstream flushes immediately.
+    """
+    queue = asyncio.Queue(maxsize=max_pending)
+    end_of_stream = object()
+
+    async def pump():
+        try:
+            async for event in events:
+                await queue.put(event)
+        except Exception as e:
+            await queue.put(e)
+            return
+        finally:
+            await events.aclose()
+        await queue.put(end_of_stream)
+
+    pump_task = asyncio.ensure_future(pump())
+    buffer = bytearray()
+    try:
+        while True:
+            item = await queue.get()
+            count = 0
+            while True:
+                if item is end_of_stream:
+                    if buffer:
+                        yield bytes(buffer)
+                    return
+                if isinstance(item, Exception):
+                    # Deliver what the stream produced before failing
+                    if buffer:
+                        yield bytes(buffer)
+                    raise item
+
+                buffer += item.encode() if isinstance(item, str) else item
+                count += 1
+                if count >= max_events or len(buffer) >= max_bytes or queue.empty():
+                    break
+                item = queue.get_nowait()
+
+            yield bytes(buffer)
+            buffer.clear()
+    finally:
+        if not pump_task.done():
+            pump_task.cancel()
+            try:
+                await pump_task
+            except asyncio.CancelledError:
+                pass
@@ -1,10 +1,13 @@
 import asyncio
 import json
+import logging
+import httpx
 from fastapi import HTTPException
 from typing import Optional, AsyncGenerator, Dict, Any
-from openai import AsyncOpenAI, AsyncAzureOpenAI
+from openai import AsyncOpenAI, AsyncAzureOpenAI, DefaultAsyncHttpxClient
 from openai.types.chat import ChatCompletion, ChatCompletionChunk
 from openai._exceptions import APIError, RateLimitError, AuthenticationError, BadRequestError
+from src.core.logging import LazyStr
 
 class OpenAIClient:
     """Async OpenAI client with cancellation support."""
@@ -12,21 +15,9 @@ class OpenAIClient:
     def __init__(self, api_key: str, base_url: str, timeout: int = 90, api_version: Optional[str] = None):
         self.api_key = api_key
         self.base_url = base_url
-        
-        # Detect if using Azure ancand instantiate the appropriate client
-        if api_version:
-            self.client = AsyncAzureOpenAI(
-                api_key=api_key,
-                azure_endpoint=base_url,
-                api_version=api_version,
-                timeout=timeout
-            )
-        else:
-            self.client = AsyncOpenAI(
-                api_key=api_key,
-                base_url=base_url,
-                timeout=timeout
-            )
+        self.timeout = timeout
+        self.api_version = api_version
+        self._connect()
         self.active_requests: Dict[str, asyncio.Event] = {}
     
     async def create_chat_completion(self, request: Dict[str, Any], request_id: Optional[str] = None) -> Dict[str, Any]:
@@ -36,7 +27,10 @@ class OpenAIClient:
         logger = logging.getLogger(__name__)
         
         # Log the full OpenAI request
-        logger.info(f"=== OPENAI API REQUEST (blocking) ===\n{json.dumps(request, indent=2)}")
+        logger.debug(
+            "=== OPENAI API REQUEST (blocking) ===\n%s",
+            LazyStr(lambda: json.dumps(request)),
+        )
         
         # Create cancellation token if request_id provided
         if request_id:
@@ -74,11 +68,16 @@ class OpenAIClient:
             else:
                 completion = await completion_task
             
-            # Debug: Log the full OpenAI response
-            logger.info(f"=== OPENAI API RESPONSE (blocking) ===\n{json.dumps(completion.model_dump(), indent=2)}")
-            
             # Convert to dict format that matches the original interface
-            return completion.model_dump()
+            completion_dict = completion.model_dump()
+
+            # Debug: Log the full OpenAI response
+            logger.debug(
+                "=== OPENAI API RESPONSE (blocking) ===\n%s",
+                LazyStr(lambda: json.dumps(completion_dict)),
+            )
+
+            return completion_dict
         
         except AuthenticationError as e:
             raise HTTPException(status_code=401, detail=self.classify_openai_error(str(e)))
@@ -174,6 +173,48 @@ class OpenAIClient:
         # Default: return original message
         return str(error_detail)
     
+    def _connect(self) -> None:
+        """Build the HTTP connection pool and the OpenAI SDK client on top of it."""
+        # Shared connection pool with keep-alive tuned for many concurrent requests
+        self.http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(max_keepalive_connections=100, max_connections=200, keepalive_expiry=30.0),
+            http2=True
+        )
+        
+        # Detect if using Azure ancand instantiate the appropriate client
+        if self.api_version:
+            self.client = AsyncAzureOpenAI(
+                api_key=self.api_key,
+                azure_endpoint=self.base_url,
+                api_version=self.api_version,
+                timeout=self.timeout,
+                http_client=self.http_client
+            )
+        else:
+            self.client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=self.timeout,
+                http_client=self.http_client
+            )
+    
+    async def start(self) -> None:
+        """Reopen the connection pool if a previous shutdown closed it, then warm it up."""
+        if self.http_client.is_closed:
+            self._connect()
+        await self.warm_up()
+    
+    async def warm_up(self) -> None:
+        """Open a pooled connection to the upstream so the first request skips the TLS handshake."""
+        try:
+            await self.http_client.head(self.base_url, timeout=5.0)
+        except Exception as e:
+            logging.getLogger(__name__).debug(f"OpenAI connection warm-up failed: {e}")
+    
+    async def close(self) -> None:
+        """Close the underlying HTTP connection pool."""
+        await self.client.close()
+    
     def cancel_request(self, request_id: str) -> bool:
         """Cancel an active request by request_id."""
         if request_id in self.active_requests:
@@ -16,6 +16,19 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+class LazyStr:
+    """Defer building an expensive log argument until a handler formats it."""
+
+    __slots__ = ("func",)
+
+    def __init__(self, func):
+        self.func = func
+
+    def __str__(self):
+        return self.func()
+
+
 # Configure uvicorn to be quieter
 for uvicorn_logger in ["uvicorn", "uvicorn.access", "uvicorn.error"]:
     logging.getLogger(uvicorn_logger).setLevel(logging.WARNING)
\ No newline at end of file
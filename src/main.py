@@ -1,11 +1,43 @@
+import asyncio
+import importlib.util
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from src.api.endpoints import router as api_router
+from fastapi.responses import ORJSONResponse
+from src.api.endpoints import (
+    router as api_router,
+    start_clients,
+    shutdown_clients,
+    get_token_encoding,
+)
+from src.api.middleware import ApiKeyASGIMiddleware
 import uvicorn
 import sys
 from src.core.config import config
+from src.core.logging import logger
 
-app = FastAPI(title="Claude-to-OpenAI API Proxy", version="1.0.0")
+# Prefer uvloop and httptools when installed (uvloop is unavailable on Windows)
+EVENT_LOOP = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+HTTP_IMPL = "httptools" if importlib.util.find_spec("httptools") else "h11"
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    loop_module = type(asyncio.get_running_loop()).__module__.split(".")[0]
+    logger.info(f"Running on {loop_module} event loop")
+    get_token_encoding()  # start loading tiktoken in the background
+    await start_clients()
+    yield
+    await shutdown_clients()
+
+
+app = FastAPI(
+    title="Claude-to-OpenAI API Proxy",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
+
+app.add_middleware(ApiKeyASGIMiddleware)
 app.include_router(api_router)
 
 
@@ -49,6 +81,7 @@ def main():
     print(f"   Max Tokens Limit: {config.max_tokens_limit}")
     print(f"   Request Timeout: {config.request_timeout}s")
     print(f"   Server: {config.host}:{config.port}")
+    print(f"   Event Loop: {EVENT_LOOP} (HTTP: {HTTP_IMPL})")
     print(f"   Client API Key Validation: {'Enabled' if config.anthropic_api_key else 'Disabled'}")
     print("")
 
@@ -66,6 +99,8 @@ def main():
         host=config.host,
         port=config.port,
         log_level=log_level,
+        loop=EVENT_LOOP,
+        http=HTTP_IMPL,
         reload=False,
     )
 
@@ -1,18 +1,52 @@
 import os
-import json
+import time
+import asyncio
+import hashlib
+import orjson
 import logging
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional
 import httpx
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+EXA_API_KEY = os.environ.get("EXA_API_KEY", "")
+
+# Process-wide cap on in-flight Exa calls to avoid bursts of 429s under load
+EXA_MAX_CONCURRENCY = 16
+
+# Exa search parameters shared by every WebSearch call; per-call fields are layered on top
+_EXA_BASE_TEMPLATE: Dict[str, Any] = {
+    "type": "auto",  # Let Exa decide between keyword and neural search
+    "numResults": 10,
+    "contents": {
+        "text": {
+            "maxCharacters": 2000
+        },
+        "highlights": {
+            "numSentences": 2
+        }
+    },
+    # Add date range for recent results
+    # You can make this configurable if needed
+    "startCrawlDate": "2024-01-01"
+}
+
+# Successful search results are cached briefly so repeated queries skip Exa
+CACHE_TTL_SECONDS = 300
+CACHE_MAX_ENTRIES = 512
+
 class ExaSearchAdapter:
     """Adapter to convert WebSearch tool calls to Exa API calls and format responses."""
     
     def __init__(self):
-        self.api_key = os.environ.get("EXA_API_KEY", "")
-        self.base_url = "https://api.exa.ai"
+        self.api_key = EXA_API_KEY
+        self._client: Optional[httpx.AsyncClient] = None
+        self._cache: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # Created inside the running loop: on Python 3.9 asyncio primitives bind
+        # to the loop that is current when they are constructed
+        self._semaphore: Optional[asyncio.Semaphore] = None
         
     async def search(self, websearch_input: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -32,50 +66,121 @@ class ExaSearchAdapter:
             return self._create_error_response("EXA_API_KEY not configured")
         
         try:
+            cache_key = self._cache_key(websearch_input)
+            if cache_key is not None:
+                cached = self._cache_get(cache_key)
+                if cached is not None:
+                    return cached
+            
             # Map WebSearch parameters to Exa API parameters
             exa_params = self._map_websearch_to_exa(websearch_input)
             
             # Make request to Exa API
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/search",
-                    headers={
-                        "x-api-key": self.api_key,
-                        "Content-Type": "application/json"
-                    },
-                    json=exa_params,
-                    timeout=30.0
-                )
-                
-                if response.status_code != 200:
-                    logger.error(f"Exa API error: {response.status_code} - {response.text}")
-                    return self._create_error_response(f"Exa API error: {response.status_code}")
-                
-                # Return the raw Exa response
-                # The format already matches what Claude expects
-                return response.json()
+            async with self._get_semaphore():
+                response = await self._get_client().post("/search", content=orjson.dumps(exa_params))
+            
+            if response.status_code != 200:
+                logger.error(f"Exa API error: {response.status_code} - {response.text}")
+                return self._create_error_response(f"Exa API error: {response.status_code}")
+            
+            # Return the raw Exa response
+            # The format already matches what Claude expects
+            result = orjson.loads(response.content)
+            if cache_key is not None:
+                self._cache_put(cache_key, result)
+            return result
                 
         except Exception as e:
             logger.error(f"Error calling Exa API: {str(e)}")
             return self._create_error_response(str(e))
     
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared Exa client, (re)creating it after a shutdown closed it."""
+        if self._client is None or self._client.is_closed:
+            # Pooled keep-alive (and HTTP/2) connections shared by all searches
+            self._client = httpx.AsyncClient(
+                base_url="https://api.exa.ai",
+                # Short pool timeout so a stuck read can't starve sibling requests of connections
+                timeout=httpx.Timeout(connect=2.0, read=25.0, write=5.0, pool=1.0),
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+                headers={
+                    "x-api-key": self.api_key,
+                    "Content-Type": "application/json"
+                },
+                http2=True
+            )
+        return self._client
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Return the process-wide Exa concurrency limiter, created in the running loop."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(EXA_MAX_CONCURRENCY)
+        return self._semaphore
+    
+    async def warm_up(self) -> None:
+        """Open a pooled connection to Exa so the first search skips the TLS handshake."""
+        if not self.api_key:
+            return
+        try:
+            await self._get_client().head("/", timeout=5.0)
+        except Exception as e:
+            logger.debug(f"Exa connection warm-up failed: {e}")
+    
+    async def aclose(self) -> None:
+        """Close the shared Exa client and its pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        # The next lifespan may run on a different loop
+        self._semaphore = None
+    
+    def _cache_key(self, websearch_input: Dict[str, Any]) -> Optional[str]:
+        """
+        Build a stable cache key from the query and domain filters.
+        Tool input comes from the model, so anything other than a string query and
+        lists of string domains is left uncached (None) rather than normalized.
+        """
+        query = websearch_input.get("query", "")
+        if not isinstance(query, str):
+            return None
+        
+        domain_filters = []
+        for field in ("allowed_domains", "blocked_domains"):
+            domains = websearch_input.get(field) or []
+            if not isinstance(domains, (list, tuple)) or not all(isinstance(d, str) for d in domains):
+                return None
+            domain_filters.append(sorted(domains))
+        
+        key_parts = (query, *domain_filters)
+        return hashlib.blake2b(orjson.dumps(key_parts, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    
+    # The cache helpers never await, so the event loop already serializes them
+    # and no lock is needed.
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached search result if present and not expired."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at > CACHE_TTL_SECONDS:
+            del self._cache[key]
+            return None
+        return result
+    
+    def _cache_put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a successful search result, evicting the oldest entries past the cap."""
+        self._cache[key] = (time.monotonic(), result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > CACHE_MAX_ENTRIES:
+            self._cache.popitem(last=False)
+    
     def _map_websearch_to_exa(self, websearch_input: Dict[str, Any]) -> Dict[str, Any]:
         """Map WebSearch parameters to Exa API format."""
+        query = websearch_input.get("query", "")
         exa_params = {
-            "query": websearch_input.get("query", ""),
-            "type": "auto",  # Let Exa decide between keyword and neural search
-            "numResults": 10,
-            "contents": {
-                "text": {
-                    "maxCharacters": 2000
-                },
-                "highlights": {
-                    "numSentences": 2
-                },
-                "summary": {
-                    "query": websearch_input.get("query", "")
-                }
-            }
+            **_EXA_BASE_TEMPLATE,
+            "query": query,
+            "contents": {**_EXA_BASE_TEMPLATE["contents"], "summary": {"query": query}}
         }
         
         # Handle domain filtering
@@ -87,10 +192,6 @@ class ExaSearchAdapter:
         if blocked_domains:
             exa_params["excludeDomains"] = blocked_domains
         
-        # Add date range for recent results
-        # You can make this configurable if needed
-        exa_params["startCrawlDate"] = "2024-01-01"
-        
         return exa_params
     
     def _create_error_response(self, error_message: str) -> Dict[str, Any]:
@@ -118,4 +219,12 @@ async def process_websearch_via_exa(tool_input: Dict[str, Any]) -> Dict[str, Any
     
     This is the main entry point for intercepting WebSearch calls.
     """
-    return await exa_adapter.search(tool_input)
\ No newline at end of file
+    return await exa_adapter.search(tool_input)
+
+async def warm_up_exa_client() -> None:
+    """Open a pooled connection to Exa so the first search skips the TLS handshake."""
+    await exa_adapter.warm_up()
+
+async def close_exa_client() -> None:
+    """Close the shared Exa HTTP client and its pooled connections."""
+    await exa_adapter.aclose()
@@ -0,0 +1,6 @@
+"""Shared pytest setup."""
+
+import os
+
+# src.core.config exits at import time without an upstream API key
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
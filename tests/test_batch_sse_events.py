@@ -0,0 +1,72 @@
+"""Tests for coalescing streamed SSE events."""
+
+import asyncio
+
+import pytest
+
+from src.conversion.response_converter import batch_sse_events
+
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+
+@pytest.mark.asyncio
+async def test_preserves_event_order():
+    async def events():
+        for i in range(20):
+            yield f"e{i}\n"
+
+    chunks = await collect(batch_sse_events(events(), max_events=8))
+
+    assert b"".join(chunks) == "".join(f"e{i}\n" for i in range(20)).encode()
+    # A burst produced without awaiting is merged up to max_events per chunk
+    assert len(chunks) == 3
+
+
+@pytest.mark.asyncio
+async def test_flushes_buffer_before_reraising():
+    async def events():
+        yield "first\n"
+        yield "second\n"
+        raise RuntimeError("upstream failed")
+
+    received = []
+    with pytest.raises(RuntimeError, match="upstream failed"):
+        async for chunk in batch_sse_events(events()):
+            received.append(chunk)
+
+    assert b"".join(received) == b"first\nsecond\n"
+
+
+@pytest.mark.asyncio
+async def test_flushes_when_upstream_is_idle():
+    async def events():
+        yield "before\n"
+        await asyncio.sleep(0.05)
+        yield "after\n"
+
+    stream = batch_sse_events(events())
+    first = await asyncio.wait_for(stream.__anext__(), timeout=0.03)
+
+    assert first == b"before\n"
+    assert await collect(stream) == [b"after\n"]
+
+
+@pytest.mark.asyncio
+async def test_closing_stops_inner_generator():
+    closed = asyncio.Event()
+
+    async def events():
+        try:
+            while True:
+                yield "tick\n"
+                await asyncio.sleep(0.01)
+        finally:
+            closed.set()
+
+    stream = batch_sse_events(events())
+    await stream.__anext__()
+    await stream.aclose()
+
+    assert closed.is_set()
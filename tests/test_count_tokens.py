@@ -0,0 +1,113 @@
+"""Tests for the count_tokens endpoint."""
+
+import time
+
+import orjson
+import pytest
+
+from src.api import endpoints
+from src.models.claude import ClaudeTokenCountRequest
+
+
+class WordEncoding:
+    """Stand-in for a tiktoken encoding: one token per whitespace-separated word."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode_ordinary(self, text):
+        self.encoded.append(text)
+        return text.split()
+
+
+@pytest.fixture
+def encoding(monkeypatch):
+    fake = WordEncoding()
+    monkeypatch.setattr(endpoints, "_token_encoding", fake)
+    return fake
+
+
+async def count(**fields):
+    request = ClaudeTokenCountRequest(model="claude-3-5-sonnet-20241022", **fields)
+    response = await endpoints.count_tokens(request)
+    return orjson.loads(response.body)["input_tokens"]
+
+
+@pytest.mark.asyncio
+async def test_string_system_prompt(encoding):
+    tokens = await count(
+        system="you are helpful",
+        messages=[{"role": "user", "content": "hello there"}],
+    )
+
+    assert tokens == 5
+    assert encoding.encoded == ["you are helpful", "hello there"]
+
+
+@pytest.mark.asyncio
+async def test_list_system_prompt(encoding):
+    tokens = await count(
+        system=[{"type": "text", "text": "first part"}, {"type": "text", "text": "second"}],
+        messages=[{"role": "user", "content": "hi"}],
+    )
+
+    assert tokens == 4
+
+
+@pytest.mark.asyncio
+async def test_only_text_blocks_are_counted(encoding):
+    tokens = await count(
+        messages=[
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": "look at this"},
+                    {"type": "image", "source": {"type": "base64"}, "text": "ignored stray text"},
+                ],
+            },
+            {
+                "role": "assistant",
+                "content": [
+                    {"type": "tool_use", "id": "t1", "name": "WebSearch", "input": {"query": "x"}},
+                ],
+            },
+            {
+                "role": "user",
+                "content": [
+                    {"type": "tool_result", "tool_use_id": "t1", "content": "result body"},
+                    {"type": "text", "text": "thanks"},
+                ],
+            },
+        ],
+    )
+
+    assert tokens == 4
+    assert encoding.encoded == ["look at this", "thanks"]
+
+
+@pytest.mark.asyncio
+async def test_large_inputs_are_encoded_off_the_event_loop(encoding, monkeypatch):
+    calls = []
+
+    async def fake_to_thread(func, *args):
+        calls.append(func)
+        return func(*args)
+
+    monkeypatch.setattr(endpoints.asyncio, "to_thread", fake_to_thread)
+    text = "word " * (endpoints.INLINE_ENCODE_MAX_CHARS // 5 + 1)
+
+    tokens = await count(messages=[{"role": "user", "content": text}])
+
+    assert tokens == endpoints.INLINE_ENCODE_MAX_CHARS // 5 + 1
+    assert calls == [endpoints._count_encoded_tokens]
+
+
+@pytest.mark.asyncio
+async def test_character_estimate_without_tiktoken(monkeypatch):
+    monkeypatch.setattr(endpoints, "_token_encoding", None)
+    # Pretend a load just failed so no background retry is started
+    monkeypatch.setattr(endpoints, "_token_encoding_failed_at", time.monotonic())
+
+    tokens = await count(messages=[{"role": "user", "content": "x" * 40}])
+
+    assert tokens == 10
@@ -0,0 +1,110 @@
+"""Tests for the Exa search result cache."""
+
+import httpx
+import orjson
+import pytest
+
+from src.utils import exa_search
+from src.utils.exa_search import ExaSearchAdapter
+
+
+def make_adapter(handler):
+    adapter = ExaSearchAdapter()
+    adapter.api_key = "exa-test"
+    adapter._client = httpx.AsyncClient(
+        base_url="https://api.exa.ai", transport=httpx.MockTransport(handler)
+    )
+    return adapter
+
+
+class FakeExa:
+    """Mock transport handler that echoes the query and counts calls."""
+
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.calls = 0
+
+    def __call__(self, request):
+        self.calls += 1
+        body = orjson.loads(request.content)
+        return httpx.Response(
+            self.status_code,
+            content=orjson.dumps({"results": [], "echo": body, "call": self.calls}),
+        )
+
+
+@pytest.mark.asyncio
+async def test_repeated_search_is_served_from_cache():
+    exa = FakeExa()
+    adapter = make_adapter(exa)
+
+    first = await adapter.search({"query": "python", "allowed_domains": ["a.com", "b.com"]})
+    second = await adapter.search({"query": "python", "allowed_domains": ["b.com", "a.com"]})
+
+    assert exa.calls == 1
+    assert second == first
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_refetched(monkeypatch):
+    exa = FakeExa()
+    adapter = make_adapter(exa)
+    now = [1000.0]
+    monkeypatch.setattr(exa_search.time, "monotonic", lambda: now[0])
+
+    await adapter.search({"query": "python"})
+    now[0] += exa_search.CACHE_TTL_SECONDS + 1
+    await adapter.search({"query": "python"})
+
+    assert exa.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_oldest_entry_is_evicted_first(monkeypatch):
+    exa = FakeExa()
+    adapter = make_adapter(exa)
+    monkeypatch.setattr(exa_search, "CACHE_MAX_ENTRIES", 2)
+
+    for query in ("one", "two", "three"):
+        await adapter.search({"query": query})
+    await adapter.search({"query": "three"})
+    assert exa.calls == 3
+
+    await adapter.search({"query": "one"})
+    assert exa.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_errors_are_never_cached():
+    exa = FakeExa(status_code=500)
+    adapter = make_adapter(exa)
+
+    first = await adapter.search({"query": "python"})
+    await adapter.search({"query": "python"})
+
+    assert first["searchType"] == "error"
+    assert exa.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_string_domains_are_not_sorted_into_the_same_key():
+    exa = FakeExa()
+    adapter = make_adapter(exa)
+
+    first = await adapter.search({"query": "q", "allowed_domains": "ab.com"})
+    second = await adapter.search({"query": "q", "allowed_domains": "ba.com"})
+
+    assert exa.calls == 2
+    assert first["echo"]["includeDomains"] == "ab.com"
+    assert second["echo"]["includeDomains"] == "ba.com"
+
+
+@pytest.mark.asyncio
+async def test_malformed_domains_do_not_raise():
+    exa = FakeExa()
+    adapter = make_adapter(exa)
+
+    result = await adapter.search({"query": "q", "allowed_domains": ["a.com", None]})
+
+    assert result["results"] == []
+    assert exa.calls == 1
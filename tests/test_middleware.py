@@ -0,0 +1,84 @@
+"""Tests for client API key validation."""
+
+import pytest
+
+from src.api.middleware import ApiKeyASGIMiddleware
+
+API_KEY = "sk-ant-test"
+
+
+async def downstream(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def call(path, headers=(), api_key=API_KEY, root_path=""):
+    middleware = ApiKeyASGIMiddleware(downstream, api_key=api_key)
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": root_path + path,
+        "root_path": root_path,
+        "headers": [(name.encode(), value.encode()) for name, value in headers],
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    return messages[0]["status"]
+
+
+@pytest.mark.asyncio
+async def test_missing_key_is_rejected():
+    assert await call("/v1/messages") == 401
+
+
+@pytest.mark.asyncio
+async def test_wrong_key_is_rejected():
+    assert await call("/v1/messages", [("x-api-key", "wrong")]) == 401
+
+
+@pytest.mark.asyncio
+async def test_x_api_key_is_accepted():
+    assert await call("/v1/messages", [("x-api-key", API_KEY)]) == 200
+
+
+@pytest.mark.asyncio
+async def test_bearer_token_is_accepted():
+    assert await call("/v1/messages", [("authorization", f"Bearer {API_KEY}")]) == 200
+
+
+@pytest.mark.asyncio
+async def test_non_bearer_authorization_is_rejected():
+    assert await call("/v1/messages", [("authorization", API_KEY)]) == 401
+
+
+@pytest.mark.asyncio
+async def test_validation_disabled_without_configured_key():
+    assert await call("/v1/messages", api_key="") == 200
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/", "/health", "/test-connection", "/docs", "/openapi.json"])
+async def test_public_paths_skip_validation(path):
+    assert await call(path) == 200
+
+
+@pytest.mark.asyncio
+async def test_unknown_paths_are_validated():
+    assert await call("/v1/messages/count_tokens") == 401
+    assert await call("/v1/other") == 401
+
+
+@pytest.mark.asyncio
+async def test_root_path_does_not_bypass_validation():
+    assert await call("/v1/messages/count_tokens", root_path="/proxy") == 401
+    assert await call(
+        "/v1/messages/count_tokens", [("x-api-key", API_KEY)], root_path="/proxy"
+    ) == 200
+    assert await call("/health", root_path="/proxy") == 200